@@ -1,58 +1,166 @@
+import asyncio
+import functools
 import logging
 import random
-from typing import Optional, Dict, List, Any, Union
-from datetime import datetime, timedelta
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.database import Database
-from pymongo.collection import Collection
+from typing import Optional, Dict, List, Any, Union, Tuple, AsyncIterator
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from cachetools import TTLCache
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
 
 from config import MONGODB_URI, DB_NAME, SUBSCRIPTION_WALLET_ADDRESS
 from data.models import User, UserScan, TokenData, WalletData, TrackingSubscription, KOLWallet
 from services.payment import get_plan_payment_details
 
-_db: Optional[Database] = None
+_client: Optional[AsyncIOMotorClient] = None
+_db: Optional[AsyncIOMotorDatabase] = None
+# Multi-document transactions need a replica set or mongos; detected in init_database
+_supports_transactions = False
+# user_scans handle returning undecoded BSON, for the per-scan counter reads
+_raw_user_scans: Optional[AsyncIOMotorCollection] = None
 
-def init_database() -> bool:
+# Short-lived cache for hot single-document reads, keyed by (collection, key).
+# Writers that change cached fields must invalidate their entries.
+_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+
+# Operations per bulk_write request when batching upserts
+_BULK_BATCH_SIZE = 100
+
+# Documents per cursor batch when streaming whole collections
+_STREAM_BATCH_SIZE = 500
+
+# Case-insensitive collation for name lookups; queries must pass the same
+# collation to be served by the matching index
+_CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+# Only the fields User.from_dict reads; user documents also carry payment,
+# referral and admin fields that bulk listings never look at
+_USER_PROJECTION = {
+    "_id": 0,
+    "user_id": 1,
+    "username": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "is_premium": 1,
+    "premium_until": 1,
+    "created_at": 1,
+    "last_active": 1
+}
+
+@functools.lru_cache(maxsize=32)
+def _plan_cached(plan: str, currency: str) -> Dict[str, Any]:
+    """Get plan payment details once per (plan, currency); treat the result as read-only"""
+    return get_plan_payment_details(plan, currency)
+
+def _connect() -> AsyncIOMotorDatabase:
+    """Create the Motor client and bind the module-level database handle"""
+    global _client, _db, _raw_user_scans
+    # Keep a warm, bounded pool so bursts of bot traffic reuse connections
+    # instead of paying a new TCP/TLS handshake per query
+    _client = AsyncIOMotorClient(
+        MONGODB_URI,
+        maxPoolSize=200,
+        minPoolSize=10,
+        maxIdleTimeMS=300_000,
+        waitQueueTimeoutMS=10_000,
+        serverSelectionTimeoutMS=5_000,
+        retryWrites=True,
+        w="majority",
+        compressors="zstd,snappy,zlib"
+    )
+    _db = _client[DB_NAME]
+    _raw_user_scans = _db.get_collection(
+        "user_scans",
+        codec_options=CodecOptions(document_class=RawBSONDocument)
+    )
+    return _db
+
+async def init_database() -> bool:
     """Initialize the database connection and set up indexes"""
-    global _db
+    global _supports_transactions
     
     try:
         # Connect to MongoDB
-        client = MongoClient(MONGODB_URI) 
-        _db = client[DB_NAME]
+        _connect()
         
         # Set up indexes for collections
         # Users collection
-        _db.users.create_index([("user_id", ASCENDING)], unique=True)
+        await _db.users.create_index([("user_id", ASCENDING)], unique=True)
+        await _db.users.create_index([("last_active", DESCENDING)])
+        await _db.users.create_index([("is_premium", ASCENDING), ("premium_until", ASCENDING)])
+        # Only admin users are indexed, so the index stays as small as the admin list
+        await _db.users.create_index(
+            [("is_admin", ASCENDING), ("user_id", ASCENDING)],
+            name="admins_partial",
+            partialFilterExpression={"is_admin": True}
+        )
         
         # User scans collection
-        _db.user_scans.create_index([
+        await _db.user_scans.create_index([
             ("user_id", ASCENDING),
             ("scan_type", ASCENDING),
             ("date", ASCENDING)
         ], unique=True)
+        await _db.user_scans.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        # Backfill records written before the TTL index existed: days that are
+        # no longer read are dropped, today's and yesterday's get an expiry
+        today = datetime.now().date()
+        recent_dates = [(today - timedelta(days=offset)).isoformat() for offset in (0, 1)]
+        await _db.user_scans.delete_many({
+            "expires_at": {"$exists": False},
+            "date": {"$lt": recent_dates[-1]}
+        })
+        for scan_date in recent_dates:
+            await _db.user_scans.update_many(
+                {"date": scan_date, "expires_at": {"$exists": False}},
+                {"$set": {"expires_at": _scan_expiry(scan_date)}}
+            )
         
         # Token data collection
-        _db.token_data.create_index([("address", ASCENDING)], unique=True)
-        _db.token_data.create_index([("deployer", ASCENDING)])
+        await _db.token_data.create_index([("address", ASCENDING)], unique=True)
+        await _db.token_data.create_index([("deployer", ASCENDING)])
         
         # Wallet data collection
-        _db.wallet_data.create_index([("address", ASCENDING)], unique=True)
-        _db.wallet_data.create_index([("is_kol", ASCENDING)])
-        _db.wallet_data.create_index([("is_deployer", ASCENDING)])
+        await _db.wallet_data.create_index([("address", ASCENDING)], unique=True)
+        await _db.wallet_data.create_index([("is_kol", ASCENDING)])
+        await _db.wallet_data.create_index([("is_deployer", ASCENDING)])
+        # Index-backed top-K for the win-rate leaderboards (sort on win_rate, range on last_updated)
+        await _db.wallet_data.create_index([("win_rate", DESCENDING), ("last_updated", DESCENDING)])
+        await _db.wallet_data.create_index([
+            ("is_deployer", ASCENDING),
+            ("win_rate", DESCENDING),
+            ("last_updated", DESCENDING)
+        ])
         
         # Tracking subscriptions collection
-        _db.tracking_subscriptions.create_index([
+        await _db.tracking_subscriptions.create_index([
             ("user_id", ASCENDING),
             ("tracking_type", ASCENDING),
             ("target_address", ASCENDING)
         ], unique=True)
         
         # KOL wallets collection
-        _db.kol_wallets.create_index([("address", ASCENDING)], unique=True)
-        _db.kol_wallets.create_index([("name", ASCENDING)])
+        await _db.kol_wallets.create_index([("address", ASCENDING)], unique=True)
+        await _db.kol_wallets.create_index(
+            [("name", ASCENDING)],
+            name="name_ci",
+            collation=_CASE_INSENSITIVE
+        )
+        # name_ci supersedes the plain name index created by earlier versions
+        if "name_1" in await _db.kol_wallets.index_information():
+            await _db.kol_wallets.drop_index("name_1")
         
-        server_info = client.server_info()
+        server_info = await _client.server_info()
+        # server_info() has completed server selection, so the driver's view of
+        # the topology is populated; this works on every server version
+        _supports_transactions = _client.topology_description.topology_type_name in (
+            "ReplicaSetWithPrimary",
+            "Sharded",
+            "LoadBalanced"
+        )
         logging.info(f"✅ Successfully connected to MongoDB version: {server_info.get('version')}")
         logging.info(f"✅ Using database: {DB_NAME}")
         return True
@@ -60,40 +168,123 @@ def init_database() -> bool:
         logging.error(f"❌ Failed to initialize database: {e}")
         return False
 
-def get_database() -> Database:
+def _scan_expiry(date: str) -> datetime:
+    """Get the UTC time at which the TTL index may drop a scan record for a local ISO date"""
+    # Keep records through the end of the following day, since usage stats
+    # still read yesterday's counts alongside today's
+    return (datetime.fromisoformat(date) + timedelta(days=2)).astimezone(timezone.utc)
+
+def _invalidate(collection: str, key: Any = None) -> None:
+    """Drop a cached document, or every cached document of a collection when no key is given"""
+    if key is not None:
+        _cache.pop((collection, key), None)
+        return
+    for cache_key in [k for k in _cache.keys() if k[0] == collection]:
+        _cache.pop(cache_key, None)
+
+def validate_pipeline(stages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Check that no $project or $addFields stage runs before the first $match
+    
+    Reshaping documents ahead of the filter stops the $match from using
+    indexes. Call this on hand-written pipelines before passing them to
+    aggregate(); the check is an assertion, so it only runs in debug mode.
+    
+    Args:
+        stages: The aggregation pipeline stages
+        
+    Returns:
+        The same stages, so calls can be inlined
+    """
+    for stage in stages:
+        if "$match" in stage:
+            break
+        assert "$project" not in stage and "$addFields" not in stage, \
+            f"Pipeline reshapes documents before its first $match: {stage}"
+    return stages
+
+def build_pipeline(
+    match: Dict[str, Any],
+    project: Optional[Dict[str, Any]] = None,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: Optional[int] = None,
+    lookups: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build an aggregation pipeline with its stages in index-friendly order
+    
+    Stages are emitted as $match, $sort, $limit, $project, then $lookup, so the
+    filter and sort can use indexes and documents shrink before any join.
+    
+    Args:
+        match: The filter for the leading $match stage
+        project: Fields to keep (must include any $lookup localField)
+        sort: (field, direction) pairs to sort by
+        limit: Maximum number of documents to pass on
+        lookups: $lookup specifications to run on the filtered documents
+        
+    Returns:
+        The list of pipeline stages
+    """
+    pipeline = [{"$match": match}]
+    if sort:
+        pipeline.append({"$sort": dict(sort)})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    if project:
+        pipeline.append({"$project": project})
+    for lookup in lookups or []:
+        pipeline.append({"$lookup": lookup})
+    return pipeline
+
+def get_database() -> AsyncIOMotorDatabase:
     """Get the database instance"""
-    global _db
     if _db is None:
-        init_database()
+        return _connect()
     return _db
 
-def get_user(user_id: int) -> Optional[User]:
+# The accessors below use the module-level _db handle directly rather than
+# going through get_database(); init_database() runs once at startup first.
+
+async def get_user(user_id: int) -> Optional[User]:
     """Get a user by ID"""
-    db = get_database()
-    user_data = db.users.find_one({"user_id": user_id})
+    cached = _cache.get(("users", user_id))
+    if cached is not None:
+        return cached
+    
+    user_data = await _db.users.find_one({"user_id": user_id})
     if user_data:
-        return User.from_dict(user_data)
+        user = User.from_dict(user_data)
+        _cache[("users", user_id)] = user
+        return user
     return None
 
-def save_user(user: User) -> None:
-    """Save or update a user"""
-    db = get_database()
-    user_dict = user.to_dict()
-    db.users.update_one(
+async def save_user(user: User) -> None:
+    """Save or update a user, writing only the fields changed since it was loaded"""
+    changes = user.dirty_fields()
+    if not changes:
+        return
+    
+    await _db.users.update_one(
         {"user_id": user.user_id},
-        {"$set": user_dict},
+        {"$set": changes},
         upsert=True
     )
+    user.mark_clean()
+    _invalidate("users", user.user_id)
+
+async def iter_all_users() -> AsyncIterator[User]:
+    """Stream all users in the database, hydrating each one as it is consumed"""
+    users = _db.users.find({}, projection=_USER_PROJECTION).batch_size(_STREAM_BATCH_SIZE)
+    async for user in users:
+        yield User.from_dict(user)
 
-def get_all_users() -> List[User]:
+async def get_all_users() -> List[User]:
     """Get all users in the database"""
-    db = get_database()
-    users = db.users.find()
-    return [User.from_dict(user) for user in users]
+    return [user async for user in iter_all_users()]
 
-def get_user_counts() -> Dict[str, int]:
+async def get_user_counts() -> Dict[str, int]:
     """Get user count statistics"""
-    db = get_database()
     now = datetime.now()
     
     # Calculate date thresholds
@@ -101,87 +292,104 @@ def get_user_counts() -> Dict[str, int]:
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
     
-    # Get counts
-    total_users = db.users.count_documents({})
-    premium_users = db.users.count_documents({"is_premium": True})
-    active_today = db.users.count_documents({"last_active": {"$gte": today_start}})
-    active_week = db.users.count_documents({"last_active": {"$gte": week_ago}})
-    active_month = db.users.count_documents({"last_active": {"$gte": month_ago}})
-    
-    return {
-        "total_users": total_users,
-        "premium_users": premium_users,
-        "active_today": active_today,
-        "active_week": active_week,
-        "active_month": active_month
+    # Run the index-backed counts concurrently, costing about one round trip
+    queries = {
+        "total_users": {},
+        "premium_users": {"is_premium": True},
+        "active_today": {"last_active": {"$gte": today_start}},
+        "active_week": {"last_active": {"$gte": week_ago}},
+        "active_month": {"last_active": {"$gte": month_ago}}
     }
+    counts = await asyncio.gather(*(
+        _db.users.count_documents(query) for query in queries.values()
+    ))
+    
+    return dict(zip(queries, counts))
 
 
-def update_user_activity(user_id: int) -> None:
+async def update_user_activity(user_id: int) -> None:
     """Update user's last active timestamp"""
-    db = get_database()
-    db.users.update_one(
+    now = datetime.now()
+    await _db.users.update_one(
         {"user_id": user_id},
-        {"$set": {"last_active": datetime.now()}}
+        {"$set": {"last_active": now}}
     )
+    
+    # Activity is touched on nearly every update, so refresh the cached user
+    # in place rather than evicting it
+    cached = _cache.get(("users", user_id))
+    if cached is not None:
+        cached.last_active = now
 
-def set_premium_status(user_id: int, is_premium: bool, duration_days: int = 30) -> None:
+async def set_premium_status(user_id: int, is_premium: bool, duration_days: int = 30) -> None:
     """Set a user's premium status"""
-    db = get_database()
     premium_until = datetime.now() + timedelta(days=duration_days) if is_premium else None
-    db.users.update_one(
+    await _db.users.update_one(
         {"user_id": user_id},
         {"$set": {
             "is_premium": is_premium,
             "premium_until": premium_until
         }}
     )
+    _invalidate("users", user_id)
 
-def get_user_scan_count(user_id: int, scan_type: str, date: str) -> int:
+async def get_user_scan_count(user_id: int, scan_type: str, date: str) -> int:
     """Get the number of scans a user has performed of a specific type on a date"""
-    db = get_database()
-    scan_data = db.user_scans.find_one({
+    # Fetch only the counter as raw BSON so it is decoded without building
+    # a full Python dict for the document
+    scan_data = await _raw_user_scans.find_one({
         "user_id": user_id,
         "scan_type": scan_type,
         "date": date
-    })
+    }, projection={"count": 1, "_id": 0})
     return scan_data.get("count", 0) if scan_data else 0
 
-def increment_user_scan_count(user_id: int, scan_type: str, date: str) -> None:
+async def increment_user_scan_count(user_id: int, scan_type: str, date: str) -> None:
     """Increment the scan count for a user"""
-    db = get_database()
-    db.user_scans.update_one(
+    await _db.user_scans.update_one(
         {
             "user_id": user_id,
             "scan_type": scan_type,
             "date": date
         },
-        {"$inc": {"count": 1}},
+        {
+            "$inc": {"count": 1},
+            "$set": {"expires_at": _scan_expiry(date)}
+        },
         upsert=True
     )
 
-def reset_user_scan_counts() -> None:
-    """Reset all user scan counts (typically called daily)"""
-    db = get_database()
-    today = datetime.now().date().isoformat()
-    # Delete all scan records except today's
-    db.user_scans.delete_many({"date": {"$ne": today}})
 
 
+async def update_token_fields(
+    address: str,
+    set_fields: Dict[str, Any],
+    set_on_insert: Optional[Dict[str, Any]] = None
+) -> TokenData:
+    """Atomically update (or create) cached token data and return the stored result"""
+    update = {"$set": {**set_fields, "last_updated": datetime.now()}}
+    if set_on_insert:
+        update["$setOnInsert"] = set_on_insert
+    
+    token_data = await _db.token_data.find_one_and_update(
+        {"address": address.lower()},
+        update,
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return TokenData.from_dict(token_data)
 
-def get_user_tracking_subscriptions(user_id: int) -> List[TrackingSubscription]:
+async def get_user_tracking_subscriptions(user_id: int) -> List[TrackingSubscription]:
     """Get all tracking subscriptions for a user"""
-    db = get_database()
-    subscriptions = db.tracking_subscriptions.find({
+    subscriptions = _db.tracking_subscriptions.find({
         "user_id": user_id,
         "is_active": True
     })
-    return [TrackingSubscription.from_dict(sub) for sub in subscriptions]
+    return [TrackingSubscription.from_dict(sub) async for sub in subscriptions]
 
-def get_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> Optional[TrackingSubscription]:
+async def get_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> Optional[TrackingSubscription]:
     """Get a specific tracking subscription"""
-    db = get_database()
-    subscription = db.tracking_subscriptions.find_one({
+    subscription = await _db.tracking_subscriptions.find_one({
         "user_id": user_id,
         "tracking_type": tracking_type,
         "target_address": target_address.lower()
@@ -190,13 +398,10 @@ def get_tracking_subscription(user_id: int, tracking_type: str, target_address:
         return TrackingSubscription.from_dict(subscription)
     return None
 
-def save_tracking_subscription(subscription: TrackingSubscription) -> None:
+async def save_tracking_subscription(subscription: TrackingSubscription) -> None:
     """Save or update a tracking subscription"""
-    db = get_database()
     sub_dict = subscription.to_dict()
-    sub_dict["target_address"] = sub_dict["target_address"].lower()  # Normalize address
-    
-    db.tracking_subscriptions.update_one(
+    await _db.tracking_subscriptions.update_one(
         {
             "user_id": sub_dict["user_id"],
             "tracking_type": sub_dict["tracking_type"],
@@ -206,20 +411,18 @@ def save_tracking_subscription(subscription: TrackingSubscription) -> None:
         upsert=True
     )
 
-def delete_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> None:
+async def delete_tracking_subscription(user_id: int, tracking_type: str, target_address: str) -> None:
     """Delete a tracking subscription"""
-    db = get_database()
-    db.tracking_subscriptions.delete_one({
+    await _db.tracking_subscriptions.delete_one({
         "user_id": user_id,
         "tracking_type": tracking_type,
         "target_address": target_address.lower()
     })
 
-def cleanup_expired_premium() -> None:
+async def cleanup_expired_premium() -> None:
     """Remove premium status from users whose premium has expired"""
-    db = get_database()
     now = datetime.now()
-    db.users.update_many(
+    await _db.users.update_many(
         {
             "is_premium": True,
             "premium_until": {"$lt": now}
@@ -229,55 +432,88 @@ def cleanup_expired_premium() -> None:
             "premium_until": None
         }}
     )
+    _invalidate("users")
+
+async def get_kol_wallet(name_or_address: str) -> Optional[KOLWallet]:
+    """Get a KOL wallet by name (case-insensitive) or address"""
+    cache_key = ("kol_wallets", name_or_address.lower())
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Look up by address first with the default collation so the unique
+    # address index applies, then fall back to the case-insensitive name index
+    kol_data = await _db.kol_wallets.find_one({"address": name_or_address.lower()})
+    if not kol_data:
+        kol_data = await _db.kol_wallets.find_one(
+            {"name": name_or_address},
+            collation=_CASE_INSENSITIVE
+        )
+    if kol_data:
+        kol_wallet = KOLWallet.from_dict(kol_data)
+        _cache[cache_key] = kol_wallet
+        return kol_wallet
+    return None
+
+async def iter_all_active_tracking_subscriptions() -> AsyncIterator[TrackingSubscription]:
+    """Stream all active tracking subscriptions, hydrating each one as it is consumed"""
+    subscriptions = _db.tracking_subscriptions.find({"is_active": True}).batch_size(_STREAM_BATCH_SIZE)
+    async for sub in subscriptions:
+        yield TrackingSubscription.from_dict(sub)
 
-def get_all_active_tracking_subscriptions() -> List[TrackingSubscription]:
+async def get_all_active_tracking_subscriptions() -> List[TrackingSubscription]:
     """Get all active tracking subscriptions across all users"""
-    db = get_database()
-    subscriptions = db.tracking_subscriptions.find({"is_active": True})
-    return [TrackingSubscription.from_dict(sub) for sub in subscriptions]
+    return [sub async for sub in iter_all_active_tracking_subscriptions()]
 
-def get_users_with_expiring_premium(days_left: List[int]) -> List[User]:
+async def get_users_with_expiring_premium(days_left: List[int]) -> List[User]:
     """Get users whose premium subscription is expiring in the specified number of days"""
-    db = get_database()
+    if not days_left:
+        return []
+    
     now = datetime.now()
     
-    # Calculate date ranges for the specified days left
-    date_ranges = []
-    for days in days_left:
-        start_date = now + timedelta(days=days)
-        end_date = start_date + timedelta(days=1)
-        date_ranges.append({"premium_until": {"$gte": start_date, "$lt": end_date}})
+    # Scan the single range covering every requested day instead of an $or of ranges
+    wanted_days = set(days_left)
+    start_date = now + timedelta(days=min(wanted_days))
+    end_date = now + timedelta(days=max(wanted_days) + 1)
     
-    # Find users with premium expiring in any of the specified ranges
-    users = db.users.find({
+    users = _db.users.find({
         "is_premium": True,
-        "$or": date_ranges
-    })
+        "premium_until": {"$gte": start_date, "$lt": end_date}
+    }, projection=_USER_PROJECTION)
     
-    return [User.from_dict(user) for user in users]
+    # Keep only users whose expiry falls on one of the requested days
+    return [
+        User.from_dict(user) async for user in users
+        if (user["premium_until"] - now).days in wanted_days
+    ]
 
-def set_user_admin_status(user_id: int, is_admin: bool) -> None:
+async def set_user_admin_status(user_id: int, is_admin: bool) -> None:
     """Set a user's admin status"""
-    db = get_database()
-    db.users.update_one(
+    await _db.users.update_one(
         {"user_id": user_id},
         {"$set": {"is_admin": is_admin}}
     )
 
-def update_user_referral_code(user_id: int, referral_code: str) -> None:
+async def get_admin_users() -> List[User]:
+    """Get all users with admin status"""
+    users = _db.users.find(
+        {"is_admin": True},
+        projection=_USER_PROJECTION
+    ).hint("admins_partial")
+    return [User.from_dict(user) async for user in users]
+
+async def update_user_referral_code(user_id: int, referral_code: str) -> None:
     """Update a user's referral code"""
-    db = get_database()
-    db.users.update_one(
+    await _db.users.update_one(
         {"user_id": user_id},
         {"$set": {"referral_code": referral_code}}
     )
 
-def record_referral(referrer_id: int, referred_id: int) -> None:
+async def record_referral(referrer_id: int, referred_id: int) -> None:
     """Record a referral relationship"""
-    db = get_database()
-    
     # Create referral record
-    db.referrals.update_one(
+    await _db.referrals.update_one(
         {
             "referrer_id": referrer_id,
             "referred_id": referred_id
@@ -293,12 +529,41 @@ def record_referral(referrer_id: int, referred_id: int) -> None:
     )
     
     # Update referrer's stats
-    db.users.update_one(
+    await _db.users.update_one(
         {"user_id": referrer_id},
         {"$inc": {"referral_count": 1}}
     )
 
-def update_user_premium_status(
+async def record_referrals_bulk(pairs: List[Tuple[int, int]]) -> None:
+    """Record many (referrer_id, referred_id) referral relationships in batched writes"""
+    now = datetime.now()
+    
+    referral_ops = [
+        UpdateOne(
+            {"referrer_id": referrer_id, "referred_id": referred_id},
+            {"$set": {
+                "referrer_id": referrer_id,
+                "referred_id": referred_id,
+                "date": now
+            }},
+            upsert=True
+        )
+        for referrer_id, referred_id in pairs
+    ]
+    
+    # One increment per referrer rather than one per referral
+    referral_counts = Counter(referrer_id for referrer_id, _ in pairs)
+    user_ops = [
+        UpdateOne({"user_id": referrer_id}, {"$inc": {"referral_count": count}})
+        for referrer_id, count in referral_counts.items()
+    ]
+    
+    for i in range(0, len(referral_ops), _BULK_BATCH_SIZE):
+        await _db.referrals.bulk_write(referral_ops[i:i + _BULK_BATCH_SIZE], ordered=False)
+    for i in range(0, len(user_ops), _BULK_BATCH_SIZE):
+        await _db.users.bulk_write(user_ops[i:i + _BULK_BATCH_SIZE], ordered=False)
+
+async def update_user_premium_status(
     user_id: int,
     is_premium: bool,
     premium_until: datetime,
@@ -318,37 +583,47 @@ def update_user_premium_status(
         transaction_id: The payment transaction ID (optional)
     """
     try:
-        # Get database connection
-        db = get_database()
-        
-        # Update user premium status
-        db.users.update_one(
-            {"user_id": user_id},
-            {"$set": {
-                "is_premium": is_premium,
-                "premium_until": premium_until,
-                "premium_plan": plan,
-                "payment_currency": payment_currency,
-                "last_payment_id": transaction_id,
-                "updated_at": datetime.now()
-            }}
-        )
+        now = datetime.now()
         
         # Get payment details
-        payment_details = get_plan_payment_details(plan, payment_currency)
+        payment_details = _plan_cached(plan, payment_currency)
         
-        # Record the transaction
-        db.transactions.insert_one({
-            "user_id": user_id,
-            "type": "premium_purchase",
-            "plan_type": plan,
-            "currency": payment_details["currency"],  # Already uppercase from get_plan_payment_details
-            "amount": payment_details["amount"],
-            "duration_days": payment_details["duration_days"],
-            "network": payment_details["network"],
-            "transaction_id": transaction_id,
-            "date": datetime.now()
-        })
+        async def write_purchase(session=None) -> None:
+            # Update user premium status
+            await _db.users.update_one(
+                {"user_id": user_id},
+                {"$set": {
+                    "is_premium": is_premium,
+                    "premium_until": premium_until,
+                    "premium_plan": plan,
+                    "payment_currency": payment_currency,
+                    "last_payment_id": transaction_id,
+                    "updated_at": now
+                }},
+                session=session
+            )
+            
+            # Record the transaction
+            await _db.transactions.insert_one({
+                "user_id": user_id,
+                "type": "premium_purchase",
+                "plan_type": plan,
+                "currency": payment_details["currency"],  # Already uppercase from get_plan_payment_details
+                "amount": payment_details["amount"],
+                "duration_days": payment_details["duration_days"],
+                "network": payment_details["network"],
+                "transaction_id": transaction_id,
+                "date": now
+            }, session=session)
+        
+        # Commit both writes together where the deployment supports it, so a
+        # user can't end up premium without a recorded transaction
+        if _supports_transactions:
+            async with await _client.start_session() as session:
+                await session.with_transaction(write_purchase)
+        else:
+            await write_purchase()
+        _invalidate("users", user_id)
         
         logging.info(f"Updated premium status for user {user_id}: premium={is_premium}, plan={plan}, currency={payment_currency}, until={premium_until}")
         
@@ -1,27 +1,47 @@
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Union
 
-class User:
+import msgspec
+
+# Models are msgspec Structs so documents are hydrated by msgspec's compiled
+# converter; from_dict stays a thin wrapper over msgspec.convert. Defaults that
+# depend on the current time, and address normalization, live in __post_init__,
+# which msgspec runs for both direct construction and conversion.
+
+# Marks a field absent from a user's loaded snapshot
+_MISSING = object()
+
+class User(msgspec.Struct):
     """User model representing a bot user"""
-    def __init__(
-        self,
-        user_id: int,
-        username: Optional[str] = None,
-        first_name: Optional[str] = None,
-        last_name: Optional[str] = None,
-        is_premium: bool = False,
-        premium_until: Optional[datetime] = None,
-        created_at: Optional[datetime] = None,
-        last_active: Optional[datetime] = None
-    ):
-        self.user_id = user_id
-        self.username = username
-        self.first_name = first_name
-        self.last_name = last_name
-        self.is_premium = is_premium
-        self.premium_until = premium_until
-        self.created_at = created_at or datetime.now()
-        self.last_active = last_active or datetime.now()
+    user_id: int
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    is_premium: bool = False
+    premium_until: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    last_active: Optional[datetime] = None
+    # The stored values the user was loaded or last saved with, so saves can
+    # send only the fields that differ
+    _loaded: Dict[str, Any] = msgspec.field(default_factory=dict)
+    
+    def __post_init__(self) -> None:
+        if self.created_at is None:
+            self.created_at = datetime.now()
+        if self.last_active is None:
+            self.last_active = datetime.now()
+    
+    def dirty_fields(self) -> Dict[str, Any]:
+        """Get the fields changed since the user was loaded or last saved"""
+        loaded = self._loaded
+        return {
+            field: value for field, value in self.to_dict().items()
+            if loaded.get(field, _MISSING) != value
+        }
+    
+    def mark_clean(self) -> None:
+        """Mark all fields as matching the stored document"""
+        self._loaded = self.to_dict()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert user object to dictionary for database storage"""
@@ -39,31 +59,18 @@ class User:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'User':
         """Create user object from dictionary"""
-        return cls(
-            user_id=data["user_id"],
-            username=data.get("username"),
-            first_name=data.get("first_name"),
-            last_name=data.get("last_name"),
-            is_premium=data.get("is_premium", False),
-            premium_until=data.get("premium_until"),
-            created_at=data.get("created_at"),
-            last_active=data.get("last_active")
-        )
+        user = msgspec.convert(data, cls, strict=False)
+        # The source document is the snapshot; nothing is copied on the read path
+        user._loaded = data
+        return user
 
 
-class UserScan:
+class UserScan(msgspec.Struct):
     """Model for tracking user scan usage"""
-    def __init__(
-        self,
-        user_id: int,
-        scan_type: str,  # 'token_scan', 'wallet_scan', etc.
-        date: str,  # ISO format date string
-        count: int = 0
-    ):
-        self.user_id = user_id
-        self.scan_type = scan_type
-        self.date = date
-        self.count = count
+    user_id: int
+    scan_type: str  # 'token_scan', 'wallet_scan', etc.
+    date: str  # ISO format date string
+    count: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert scan object to dictionary for database storage"""
@@ -77,39 +84,26 @@ class UserScan:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'UserScan':
         """Create scan object from dictionary"""
-        return cls(
-            user_id=data["user_id"],
-            scan_type=data["scan_type"],
-            date=data["date"],
-            count=data["count"]
-        )
+        return msgspec.convert(data, cls, strict=False)
 
 
-class TokenData:
+class TokenData(msgspec.Struct):
     """Model for cached token data"""
-    def __init__(
-        self,
-        address: str,
-        name: Optional[str] = None,
-        symbol: Optional[str] = None,
-        deployer: Optional[str] = None,
-        deployment_date: Optional[datetime] = None,
-        current_price: Optional[float] = None,
-        current_market_cap: Optional[float] = None,
-        ath_market_cap: Optional[float] = None,
-        ath_date: Optional[datetime] = None,
-        last_updated: Optional[datetime] = None
-    ):
-        self.address = address
-        self.name = name
-        self.symbol = symbol
-        self.deployer = deployer
-        self.deployment_date = deployment_date
-        self.current_price = current_price
-        self.current_market_cap = current_market_cap
-        self.ath_market_cap = ath_market_cap
-        self.ath_date = ath_date
-        self.last_updated = last_updated or datetime.now()
+    address: str
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    deployer: Optional[str] = None
+    deployment_date: Optional[datetime] = None
+    current_price: Optional[float] = None
+    current_market_cap: Optional[float] = None
+    ath_market_cap: Optional[float] = None
+    ath_date: Optional[datetime] = None
+    last_updated: Optional[datetime] = None
+    
+    def __post_init__(self) -> None:
+        self.address = self.address.lower()
+        if self.last_updated is None:
+            self.last_updated = datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert token data to dictionary for database storage"""
@@ -129,43 +123,27 @@ class TokenData:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TokenData':
         """Create token data object from dictionary"""
-        return cls(
-            address=data["address"],
-            name=data.get("name"),
-            symbol=data.get("symbol"),
-            deployer=data.get("deployer"),
-            deployment_date=data.get("deployment_date"),
-            current_price=data.get("current_price"),
-            current_market_cap=data.get("current_market_cap"),
-            ath_market_cap=data.get("ath_market_cap"),
-            ath_date=data.get("ath_date"),
-            last_updated=data.get("last_updated")
-        )
+        return msgspec.convert(data, cls, strict=False)
 
 
-class WalletData:
+class WalletData(msgspec.Struct):
     """Model for cached wallet data"""
-    def __init__(
-        self,
-        address: str,
-        name: Optional[str] = None,  # For KOL wallets
-        is_kol: bool = False,
-        is_deployer: bool = False,
-        tokens_deployed: Optional[List[str]] = None,
-        avg_holding_time: Optional[int] = None,  # in seconds
-        total_trades: Optional[int] = None,
-        win_rate: Optional[float] = None,
-        last_updated: Optional[datetime] = None
-    ):
-        self.address = address
-        self.name = name
-        self.is_kol = is_kol
-        self.is_deployer = is_deployer
-        self.tokens_deployed = tokens_deployed or []
-        self.avg_holding_time = avg_holding_time
-        self.total_trades = total_trades
-        self.win_rate = win_rate
-        self.last_updated = last_updated or datetime.now()
+    address: str
+    name: Optional[str] = None  # For KOL wallets
+    is_kol: bool = False
+    is_deployer: bool = False
+    tokens_deployed: Optional[List[str]] = None
+    avg_holding_time: Optional[int] = None  # in seconds
+    total_trades: Optional[int] = None
+    win_rate: Optional[float] = None
+    last_updated: Optional[datetime] = None
+    
+    def __post_init__(self) -> None:
+        self.address = self.address.lower()
+        if self.tokens_deployed is None:
+            self.tokens_deployed = []
+        if self.last_updated is None:
+            self.last_updated = datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert wallet data to dictionary for database storage"""
@@ -184,38 +162,27 @@ class WalletData:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'WalletData':
         """Create wallet data object from dictionary"""
-        return cls(
-            address=data["address"],
-            name=data.get("name"),
-            is_kol=data.get("is_kol", False),
-            is_deployer=data.get("is_deployer", False),
-            tokens_deployed=data.get("tokens_deployed", []),
-            avg_holding_time=data.get("avg_holding_time"),
-            total_trades=data.get("total_trades"),
-            win_rate=data.get("win_rate"),
-            last_updated=data.get("last_updated")
-        )
+        return msgspec.convert(data, cls, strict=False)
 
 
-class TrackingSubscription:
+class TrackingSubscription(msgspec.Struct):
     """Model for tracking subscriptions"""
-    def __init__(
-        self,
-        user_id: int,
-        tracking_type: str,  # 'token_holders', 'wallet_deployment', 'wallet_trades'
-        target_address: str,
-        created_at: Optional[datetime] = None,
-        last_checked: Optional[datetime] = None,
-        is_active: bool = True,
-        metadata=None
-    ):
-        self.user_id = user_id
-        self.tracking_type = tracking_type
-        self.target_address = target_address
-        self.created_at = created_at or datetime.now()
-        self.last_checked = last_checked or datetime.now()
-        self.is_active = is_active
-        self.metadata = metadata or {}
+    user_id: int
+    tracking_type: str  # 'token_holders', 'wallet_deployment', 'wallet_trades'
+    target_address: str
+    created_at: Optional[datetime] = None
+    last_checked: Optional[datetime] = None
+    is_active: bool = True
+    metadata: Optional[Dict[str, Any]] = None
+    
+    def __post_init__(self) -> None:
+        self.target_address = self.target_address.lower()
+        if self.created_at is None:
+            self.created_at = datetime.now()
+        if self.last_checked is None:
+            self.last_checked = datetime.now()
+        if self.metadata is None:
+            self.metadata = {}
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert tracking subscription to dictionary for database storage"""
@@ -232,32 +199,23 @@ class TrackingSubscription:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TrackingSubscription':
         """Create tracking subscription object from dictionary"""
-        return cls(
-            user_id=data["user_id"],
-            tracking_type=data["tracking_type"],
-            target_address=data["target_address"],
-            created_at=data.get("created_at"),
-            last_checked=data.get("last_checked"),
-            is_active=data.get("is_active", True),
-            metadata=data.get("metadata", {})
-        )
+        return msgspec.convert(data, cls, strict=False)
 
 
-class KOLWallet:
+class KOLWallet(msgspec.Struct):
     """Model for KOL (Key Opinion Leader) wallets"""
-    def __init__(
-        self,
-        address: str,
-        name: str,
-        description: Optional[str] = None,
-        social_links: Optional[Dict[str, str]] = None,
-        added_at: Optional[datetime] = None
-    ):
-        self.address = address
-        self.name = name
-        self.description = description
-        self.social_links = social_links or {}
-        self.added_at = added_at or datetime.now()
+    address: str
+    name: str
+    description: Optional[str] = None
+    social_links: Optional[Dict[str, str]] = None
+    added_at: Optional[datetime] = None
+    
+    def __post_init__(self) -> None:
+        self.address = self.address.lower()
+        if self.social_links is None:
+            self.social_links = {}
+        if self.added_at is None:
+            self.added_at = datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert KOL wallet to dictionary for database storage"""
@@ -272,10 +230,4 @@ class KOLWallet:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'KOLWallet':
         """Create KOL wallet object from dictionary"""
-        return cls(
-            address=data["address"],
-            name=data["name"],
-            description=data.get("description"),
-            social_links=data.get("social_links", {}),
-            added_at=data.get("added_at")
-        )
+        return msgspec.convert(data, cls, strict=False)
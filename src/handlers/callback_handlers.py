@@ -254,7 +254,7 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                     "deployer": deployer_wallet
                 }
             )
-            save_tracking_subscription(token_subscription)
+            await save_tracking_subscription(token_subscription)
             
             # Track deployer wallet if available
             if deployer_wallet:
@@ -271,7 +271,7 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                         "token_symbol": token_info.get("symbol", "Unknown")
                     }
                 )
-                save_tracking_subscription(deployer_subscription)
+                await save_tracking_subscription(deployer_subscription)
             
             # Track top holders
             for holder in top_holders:
@@ -289,7 +289,7 @@ async def handle_expected_input(update: Update, context: ContextTypes.DEFAULT_TY
                         "percentage": holder.get("percentage", 0)
                     }
                 )
-                save_tracking_subscription(holder_subscription)
+                await save_tracking_subscription(holder_subscription)
             
             # Format the response
             response = (
@@ -1019,7 +1019,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                 "deployer": deployer_wallet
             }
         )
-        save_tracking_subscription(token_subscription)
+        await save_tracking_subscription(token_subscription)
         
         # Track deployer wallet if available
         if deployer_wallet:
@@ -1036,7 +1036,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                     "token_symbol": token_info.get("symbol", "Unknown")
                 }
             )
-            save_tracking_subscription(deployer_subscription)
+            await save_tracking_subscription(deployer_subscription)
         
         # Track top holders
         for holder in top_holders:
@@ -1054,7 +1054,7 @@ async def handle_setup_whale_tracking(update: Update, context: ContextTypes.DEFA
                     "percentage": holder.get("percentage", 0)
                 }
             )
-            save_tracking_subscription(holder_subscription)
+            await save_tracking_subscription(holder_subscription)
         
         # Format confirmation message
         response = (
@@ -1510,7 +1510,7 @@ async def handle_token_analysis_input(
         if success:
             # Get the user directly from the message update
             user_id = update.effective_user.id
-            user = get_user(user_id)
+            user = await get_user(user_id)
             if not user:
                 # Create user if not exists
                 user = User(user_id=user_id, username=update.effective_user.username)
@@ -1620,7 +1620,7 @@ async def handle_wallet_analysis_input(
         if success:
             # Get the user directly from the message update
             user_id = update.effective_user.id
-            user = get_user(user_id)
+            user = await get_user(user_id)
             if not user:
                 # Create user if not exists
                 user = User(user_id=user_id, username=update.effective_user.username)
@@ -2050,7 +2050,7 @@ async def handle_tracking_input(update: Update, context: ContextTypes.DEFAULT_TY
         target_address: Address to track (wallet or token)
     """
     # Get user from database
-    user = get_user(update.effective_user.id)
+    user = await get_user(update.effective_user.id)
     
     # Validate address format
     if not await is_valid_address(target_address):
@@ -2077,7 +2077,7 @@ async def handle_tracking_input(update: Update, context: ContextTypes.DEFAULT_TY
     )
     
     # Save subscription
-    save_tracking_subscription(subscription)
+    await save_tracking_subscription(subscription)
     
     # Prepare confirmation message
     tracking_type_display = {
@@ -2144,7 +2144,7 @@ async def handle_profitable_wallets_tracking(update: Update, context: ContextTyp
         )
         
         # Save token subscription
-        save_tracking_subscription(token_subscription)
+        await save_tracking_subscription(token_subscription)
         
         # Also track the top profitable wallets individually
         for wallet in profitable_wallets:
@@ -2155,7 +2155,7 @@ async def handle_profitable_wallets_tracking(update: Update, context: ContextTyp
                 is_active=True,
                 created_at=datetime.now()
             )
-            save_tracking_subscription(wallet_subscription)
+            await save_tracking_subscription(wallet_subscription)
         
         # Format the response
         response = (
@@ -2197,7 +2197,7 @@ async def handle_view_tracking_subscriptions(update: Update, context: ContextTyp
     user = await check_callback_user(update)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     if not subscriptions:
         keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="tracking_and_monitoring")]]
@@ -2281,7 +2281,7 @@ async def handle_manage_wallet_tracking(update: Update, context: ContextTypes.DE
     user = await check_callback_user(update)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     wallet_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "wallet_trades"]
@@ -2331,7 +2331,7 @@ async def handle_manage_deployment_tracking(update: Update, context: ContextType
     user = await check_callback_user(update)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     deployment_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "token_deployments"]
@@ -2375,7 +2375,7 @@ async def handle_manage_token_tracking(update: Update, context: ContextTypes.DEF
     user = await check_callback_user(update)
     
     # Get user's tracking subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     # Filter subscriptions by type
     token_subscriptions = [sub for sub in subscriptions if sub.tracking_type == "token_profitable_wallets"]
@@ -2428,10 +2428,10 @@ async def handle_remove_tracking(update: Update, context: ContextTypes.DEFAULT_T
         
     try:
         # Get all user's tracking subscriptions
-        subscriptions = get_user_tracking_subscriptions(user.user_id)
+        subscriptions = await get_user_tracking_subscriptions(user.user_id)
         
         # Filter subscriptions for the target address
-        matching_subs = [sub for sub in subscriptions if sub.target_address.lower() == target_address.lower()]
+        matching_subs = [sub for sub in subscriptions if sub.target_address == target_address.lower()]
         
         if not matching_subs:
             await query.answer("No matching tracking subscription found.", show_alert=True)
@@ -2439,7 +2439,7 @@ async def handle_remove_tracking(update: Update, context: ContextTypes.DEFAULT_T
         
         # Delete each matching subscription
         for sub in matching_subs:
-            delete_tracking_subscription(user.user_id, sub.tracking_type, sub.target_address)
+            await delete_tracking_subscription(user.user_id, sub.tracking_type, sub.target_address)
         
         await query.answer("Tracking subscription(s) removed successfully!")
         
@@ -2826,7 +2826,7 @@ async def handle_payment_made(update: Update, context: ContextTypes.DEFAULT_TYPE
             from data.database import update_user_premium_status
             
             # Update user status
-            update_user_premium_status(
+            await update_user_premium_status(
                 user_id=user.user_id,
                 is_premium=True,
                 premium_until=premium_until,
@@ -3055,7 +3055,7 @@ async def handle_track_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE
     )
     
     # Save subscription
-    save_tracking_subscription(subscription)
+    await save_tracking_subscription(subscription)
     
     # Confirm to user
     await query.edit_message_text(
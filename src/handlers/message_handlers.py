@@ -519,7 +519,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "deployer", wallet_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "deployer", wallet_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -537,7 +537,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             await update.message.reply_text(
                 f"✅ Now tracking wallet: `{wallet_address[:6]}...{wallet_address[-4:]}`\n\n"
@@ -562,7 +562,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "wallet", wallet_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "wallet", wallet_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -580,7 +580,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             await update.message.reply_text(
                 f"✅ Now tracking wallet: `{wallet_address[:6]}...{wallet_address[-4:]}`\n\n"
@@ -605,7 +605,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
             from data.database import save_tracking_subscription, get_tracking_subscription, get_token_data
             
             # Check if subscription already exists
-            existing_sub = get_tracking_subscription(user.user_id, "token", token_address)
+            existing_sub = await get_tracking_subscription(user.user_id, "token", token_address)
             
             if existing_sub and existing_sub.is_active:
                 await update.message.reply_text(
@@ -623,7 +623,7 @@ async def handle_command_track(update: Update, context: ContextTypes.DEFAULT_TYP
                 created_at=datetime.now()
             )
             
-            save_tracking_subscription(subscription)
+            await save_tracking_subscription(subscription)
             
             # Get token data for name
             token_data = await get_token_data(token_address)
@@ -654,7 +654,7 @@ async def handle_command_my_tracking(update: Update, context: ContextTypes.DEFAU
     
     # Get user's tracking subscriptions
     from data.database import get_user_tracking_subscriptions
-    subscriptions = get_user_tracking_subscriptions(user.user_id)
+    subscriptions = await get_user_tracking_subscriptions(user.user_id)
     
     if not subscriptions:
         await update.message.reply_text(
@@ -1,6 +1,5 @@
 import logging
 import sys
-import asyncio
 from telegram import Update
 from telegram.ext import ApplicationBuilder, CallbackQueryHandler, MessageHandler, filters
 from config import TELEGRAM_TOKEN
@@ -16,11 +15,17 @@ logging.basicConfig(
 
 async def post_init(application):
     """Run after the application has been initialized"""
+    # Initialize the database on the application's event loop, which Motor
+    # binds to on first use, so every later query runs on that same loop
+    if not await init_database():
+        logging.error("❌ Could not connect to MongoDB. Please check your configuration.")
+        sys.exit(1)
+    
     # Start the blockchain monitor
     await start_blockchain_monitor()
 
 def create_bot():
-    application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    application = ApplicationBuilder().token(TELEGRAM_TOKEN).post_init(post_init).build()
     application.add_handler(MessageHandler(filters.Text(["/start"]), handle_start_menu))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_expected_input))
     application.add_handler(CallbackQueryHandler(handle_profitable_period_selection, pattern="^profitable_period_"))
@@ -31,24 +36,11 @@ def create_bot():
     return application
 
 def main():
-    # Initialize database connection
-    if not init_database():
-        logging.error("❌ Could not connect to MongoDB. Please check your configuration.")
-        sys.exit(1)
-    
     logging.info("🚀 Starting Crypto DeFi Analyze Telegram Bot... 💎")
     
+    # The database and blockchain monitor are started in post_init
     app = create_bot()
     
-    # Start the blockchain monitor in a separate thread
-    import threading
-    def run_blockchain_monitor():
-        asyncio.run(start_blockchain_monitor())
-    
-    monitor_thread = threading.Thread(target=run_blockchain_monitor)
-    monitor_thread.daemon = True  # This ensures the thread will exit when the main program exits
-    monitor_thread.start()
-    
     # Run the polling
     app.run_polling(allowed_updates=Update.ALL_TYPES)
 
@@ -486,7 +486,7 @@ async def monitor_blockchain_events():
     while True:
         try:
             # Get all active tracking subscriptions
-            subscriptions = get_all_active_tracking_subscriptions()
+            subscriptions = await get_all_active_tracking_subscriptions()
             
             if not subscriptions:
                 # No active subscriptions, sleep and check again later
@@ -12,7 +12,7 @@ from data.database import (
 async def get_or_create_user(user_id: int, username: Optional[str] = None, 
                            first_name: Optional[str] = None, last_name: Optional[str] = None) -> User:
     """Get a user from the database or create if not exists"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     
     if not user:
         # Create new user
@@ -22,16 +22,16 @@ async def get_or_create_user(user_id: int, username: Optional[str] = None,
             first_name=first_name,
             last_name=last_name
         )
-        save_user(user)
+        await save_user(user)
     else:
         # Update user activity
-        update_user_activity(user_id)
+        await update_user_activity(user_id)
     
     return user
 
 async def extend_premium_subscription(user_id: int, additional_days: int) -> bool:
     """Extend an existing premium subscription"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return False
     
@@ -42,10 +42,10 @@ async def extend_premium_subscription(user_id: int, additional_days: int) -> boo
             current_expiry = user.premium_until
             new_expiry = current_expiry + timedelta(days=additional_days)
             days_until_expiry = (new_expiry - datetime.now()).days
-            set_premium_status(user_id, True, days_until_expiry)
+            await set_premium_status(user_id, True, days_until_expiry)
         else:
             # If not premium, start new subscription
-            set_premium_status(user_id, True, additional_days)
+            await set_premium_status(user_id, True, additional_days)
         
         return True
     except Exception as e:
@@ -57,7 +57,7 @@ async def check_rate_limit_service(user_id: int, scan_type: str, limit: int) ->
     Check if user has exceeded their daily scan limit
     Returns (has_reached_limit, current_count)
     """
-    user = get_user(user_id)
+    user = await get_user(user_id)
     
     # Premium users have no limits
     if user and user.is_premium:
@@ -65,19 +65,19 @@ async def check_rate_limit_service(user_id: int, scan_type: str, limit: int) ->
     
     # Check scan count for today
     today = datetime.now().date().isoformat()
-    scan_count = get_user_scan_count(user_id, scan_type, today)
+    scan_count = await get_user_scan_count(user_id, scan_type, today)
     
     return scan_count >= limit, scan_count
 
 async def increment_scan_count(user_id: int, scan_type: str) -> int:
     """Increment a user's scan count and return the new count"""
     today = datetime.now().date().isoformat()
-    increment_user_scan_count(user_id, scan_type, today)
-    return get_user_scan_count(user_id, scan_type, today)
+    await increment_user_scan_count(user_id, scan_type, today)
+    return await get_user_scan_count(user_id, scan_type, today)
 
 async def get_user_premium_info(user_id: int) -> Dict[str, Any]:
     """Get information about a user's premium status"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return {
             "is_premium": False,
@@ -107,7 +107,7 @@ async def get_user_premium_info(user_id: int) -> Dict[str, Any]:
 
 async def get_user_usage_stats(user_id: int) -> Dict[str, Any]:
     """Get a user's usage statistics"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return {}
     
@@ -115,16 +115,16 @@ async def get_user_usage_stats(user_id: int) -> Dict[str, Any]:
     yesterday = (datetime.now() - timedelta(days=1)).date().isoformat()
     
     # Get today's scan counts
-    token_scans_today = get_user_scan_count(user_id, "token_scan", today)
-    wallet_scans_today = get_user_scan_count(user_id, "wallet_scan", today)
+    token_scans_today = await get_user_scan_count(user_id, "token_scan", today)
+    wallet_scans_today = await get_user_scan_count(user_id, "wallet_scan", today)
     
     # Get yesterday's scan counts
-    token_scans_yesterday = get_user_scan_count(user_id, "token_scan", yesterday)
-    wallet_scans_yesterday = get_user_scan_count(user_id, "wallet_scan", yesterday)
+    token_scans_yesterday = await get_user_scan_count(user_id, "token_scan", yesterday)
+    wallet_scans_yesterday = await get_user_scan_count(user_id, "wallet_scan", yesterday)
     
     # Get tracking subscriptions
     from data.database import get_user_tracking_subscriptions
-    tracking_subscriptions = get_user_tracking_subscriptions(user_id)
+    tracking_subscriptions = await get_user_tracking_subscriptions(user_id)
     
     token_tracks = sum(1 for sub in tracking_subscriptions if sub.tracking_type == "token")
     wallet_tracks = sum(1 for sub in tracking_subscriptions if sub.tracking_type == "wallet")
@@ -150,7 +150,7 @@ async def cleanup_expired_premium_subscriptions() -> int:
     """
     try:
         # This function is in data.database
-        cleanup_expired_premium()
+        await cleanup_expired_premium()
         
         # Count how many were expired (would need to be implemented in database.py)
         # For now, just return a placeholder
@@ -161,7 +161,7 @@ async def cleanup_expired_premium_subscriptions() -> int:
 
 async def get_user_referral_code(user_id: int) -> str:
     """Get a user's referral code"""
-    user = get_user(user_id)
+    user = await get_user(user_id)
     if not user:
         return ""
     
@@ -172,7 +172,7 @@ async def get_user_referral_code(user_id: int) -> str:
         
         # Save the referral code
         from data.database import update_user_referral_code
-        update_user_referral_code(user_id, referral_code)
+        await update_user_referral_code(user_id, referral_code)
         
         return referral_code
     
@@ -185,8 +185,8 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
     """
     try:
         # Check if users exist
-        referrer = get_user(referrer_id)
-        referred = get_user(referred_id)
+        referrer = await get_user(referrer_id)
+        referred = await get_user(referred_id)
         
         if not referrer or not referred:
             return False
@@ -197,7 +197,7 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
         
         # Record the referral
         from data.database import record_referral
-        record_referral(referrer_id, referred_id)
+        await record_referral(referrer_id, referred_id)
         
         # Give the referrer some benefit (e.g., extra free scans or discount)
         # This would be implemented based on the referral program specifics
@@ -210,7 +210,7 @@ async def process_referral(referrer_id: int, referred_id: int) -> bool:
 async def get_user_count_stats() -> Dict[str, int]:
     """Get user count statistics"""
     try:
-        return get_user_counts()
+        return await get_user_counts()
     except Exception as e:
         logging.error(f"Error getting user count stats: {e}")
         return {